@@ -98,3 +98,41 @@ MIN_PITCHES_PER_SIDE = 50  # Min pitches vs a batter side for split zone feature
 # Dashboard / display
 # ------------------------------------------------------------------
 MIN_PA_DISPLAY = 10  # Minimum PAs for a hitter-vs-cluster row in the UI
+
+# ------------------------------------------------------------------
+# Archetype display metadata (shared by v22 profiling and frontend export)
+# ------------------------------------------------------------------
+# Consistent colors per archetype name
+ARCHETYPE_COLORS = {
+    "Earthworm":           "#a0584a",  # Terra Cotta (H=10)
+    "Eephus Lobber":       "#a86e3d",  # Brown (H=25)
+    "Uncle Charlie":       "#c9a03e",  # Gold (H=42)
+    "Yakker":              "#b8b230",  # Yellow (H=57)
+    "Snake":               "#7db04a",  # Lime Green (H=80)
+    "Gardener":            "#4da85e",  # Spring Green (H=96)
+    "Kitchen Sink":        "#45a87e",  # Mint (H=120)
+    "Boomerang":           "#3aaf9f",  # Emerald (H=166)
+    "CutCraft":            "#3a8cc4",  # Azure Blue (H=207)
+    "Ghost":               "#8899aa",  # Cool Gray (H=210)
+    "Undertow":            "#4178c9",  # Ocean Blue (H=218)
+    "Cutman":              "#8592d6",  # Periwinkle (H=230)
+    "Heavy Duty":          "#6b5ecc",  # Deep Purple (H=245)
+    "Knuckleball Wizard":  "#8b52cc",  # Violet (H=265)
+    "Split Demon":         "#ab47c4",  # Orchid (H=280)
+    "Triple Threat":       "#c43fa8",  # Magenta (H=295)
+    "Swordfighter":        "#c94185",  # Hot Pink (H=315)
+    "Barnburner":          "#cc4565",  # Rose (H=335)
+}
+
+EMOJI_MAP = {
+    "Snake": "\U0001F40D", "Triple Threat": "3\uFE0F\u20E3",
+    "Split Demon": "\U0001F479", "Yakker": "\U0001F9AC",
+    "Boomerang": "\U0001FA83",
+    "Knuckleball Wizard": "\U0001F9D9", "Barnburner": "\u26FD",
+    "Uncle Charlie": "\U0001F37A", "Ghost": "\U0001F47B",
+    "Cutman": "\U0001F5E1", "Earthworm": "\U0001FAB1",
+    "Gardener": "\U0001F9D1\u200D\U0001F33E", "Undertow": "\U0001F30A",
+    "Eephus Lobber": "\U0001FAA6", "Kitchen Sink": "\U0001F6B0",
+    "Heavy Duty": "\U0001F3CB\uFE0F", "Swordfighter": "\u2694\uFE0F",
+    "CutCraft": "\u2702\uFE0F",
+}
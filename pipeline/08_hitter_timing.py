@@ -8,6 +8,7 @@ Computes per-batter-cluster timing patterns from raw Statcast data:
   - Steady Eddie:   Low variance in per-game hit rates (consistent)
 
 Outputs: frontend/public/hitter_timing.json
+  {"fields": [...], "rows": [[batter, cluster, labels, tto0, tto1, tto2, var, games], ...]}
 """
 
 import json
@@ -18,6 +19,9 @@ import pandas as pd
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 OUT = os.path.join(BASE, "frontend", "public")
 
+# Tabular output schema: field names are emitted once, each row is a positional array
+FIELDS = ["batter", "cluster", "labels", "tto0", "tto1", "tto2", "var", "games"]
+
 
 def main():
     print("Loading raw Statcast data...")
@@ -26,7 +30,7 @@ def main():
         print("  statcast_raw.parquet not found — skipping timing analysis")
         # Write empty placeholder so frontend doesn't break
         with open(os.path.join(OUT, "hitter_timing.json"), "w") as f:
-            json.dump({}, f)
+            json.dump({"fields": FIELDS, "rows": []}, f, separators=(",", ":"))
         return
 
     df = pd.read_parquet(raw_path, columns=[
@@ -79,21 +83,14 @@ def main():
 
     # ── Per-game hit rates (for variance/consistency) ──
     print("Computing per-game consistency...")
-    game_rates = (
-        df.groupby(["batter", "cluster", "game_pk"])
-        .agg(hits=("is_hit", "sum"), pa=("is_hit", "count"))
-        .reset_index()
-    )
-    game_rates["game_ba"] = game_rates["hits"] / game_rates["pa"].clip(lower=1)
+    # Per-game BA as a single indexed Series (mean of is_hit == hits / PA),
+    # reduced straight to moments on the (batter, cluster) index levels
+    game_ba = df.groupby(["batter", "cluster", "game_pk"], sort=False)["is_hit"].mean()
 
     # Need at least 5 games vs a cluster to compute meaningful variance
     game_var = (
-        game_rates.groupby(["batter", "cluster"])
-        .agg(
-            n_games=("game_ba", "count"),
-            ba_var=("game_ba", "var"),
-            ba_mean=("game_ba", "mean"),
-        )
+        game_ba.groupby(level=["batter", "cluster"], sort=False)
+        .agg(n_games="count", ba_var="var", ba_mean="mean")
         .reset_index()
     )
     game_var = game_var[game_var["n_games"] >= 5]
@@ -120,7 +117,6 @@ def main():
         if batter is None or cluster is None:
             continue
 
-        key = f"{batter}_{cluster}"
         labels = []
 
         tto0 = row.get("tto0_ba", np.nan)
@@ -147,7 +143,7 @@ def main():
                 labels.append("Steady Eddie")
 
         if labels:
-            results[key] = {
+            results[(batter, cluster)] = {
                 "labels": labels,
                 "tto": [
                     round(tto0, 3) if pd.notna(tto0) else None,
@@ -158,9 +154,14 @@ def main():
                 "games": int(row["n_games"]) if pd.notna(row.get("n_games")) else 0,
             }
 
+    rows = [
+        [b, c, r["labels"], *r["tto"], r["var"], r["games"]]
+        for (b, c), r in results.items()
+    ]
+
     out_path = os.path.join(OUT, "hitter_timing.json")
     with open(out_path, "w") as f:
-        json.dump(results, f, separators=(",", ":"))
+        json.dump({"fields": FIELDS, "rows": rows}, f, separators=(",", ":"))
 
     print(f"  Wrote {len(results)} batter-cluster timing profiles → {out_path}")
     print("Done.")
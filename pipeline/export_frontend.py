@@ -13,12 +13,15 @@ Usage:
 
 import os
 import sys
-import json
+import orjson
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
+import pyarrow.parquet as pq
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import MODELS_DIR
+from config import MODELS_DIR, ARCHETYPE_COLORS, EMOJI_MAP
 
 FRONTEND_DATA_DIR = os.path.join(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
@@ -27,137 +30,281 @@ FRONTEND_DATA_DIR = os.path.join(
 
 YEARS = range(2015, 2026)
 
-# Consistent colors per archetype name
-ARCHETYPE_COLORS = {
-    "Earthworm":           "#a0584a",  # Terra Cotta (H=10)
-    "Eephus Lobber":       "#a86e3d",  # Brown (H=25)
-    "Uncle Charlie":       "#c9a03e",  # Gold (H=42)
-    "Yakker":              "#b8b230",  # Yellow (H=57)
-    "Snake":               "#7db04a",  # Lime Green (H=80)
-    "Gardener":            "#4da85e",  # Spring Green (H=96)
-    "Kitchen Sink":        "#45a87e",  # Mint (H=120)
-    "Boomerang":           "#3aaf9f",  # Emerald (H=166)
-    "CutCraft":            "#3a8cc4",  # Azure Blue (H=207)
-    "Ghost":               "#8899aa",  # Cool Gray (H=210)
-    "Undertow":            "#4178c9",  # Ocean Blue (H=218)
-    "Cutman":              "#8592d6",  # Periwinkle (H=230)
-    "Heavy Duty":          "#6b5ecc",  # Deep Purple (H=245)
-    "Knuckleball Wizard":  "#8b52cc",  # Violet (H=265)
-    "Split Demon":         "#ab47c4",  # Orchid (H=280)
-    "Triple Threat":       "#c43fa8",  # Magenta (H=295)
-    "Swordfighter":        "#c94185",  # Hot Pink (H=315)
-    "Barnburner":          "#cc4565",  # Rose (H=335)
-}
-
-EMOJI_MAP = {
-    "Snake": "\U0001F40D", "Triple Threat": "3\uFE0F\u20E3",
-    "Split Demon": "\U0001F479", "Yakker": "\U0001F9AC",
-    "Boomerang": "\U0001FA83",
-    "Knuckleball Wizard": "\U0001F9D9", "Barnburner": "\u26FD",
-    "Uncle Charlie": "\U0001F37A", "Ghost": "\U0001F47B",
-    "Cutman": "\U0001F5E1", "Earthworm": "\U0001FAB1",
-    "Gardener": "\U0001F9D1\u200D\U0001F33E", "Undertow": "\U0001F30A",
-    "Eephus Lobber": "\U0001FAA6", "Kitchen Sink": "\U0001F6B0",
-    "Heavy Duty": "\U0001F3CB\uFE0F", "Swordfighter": "\u2694\uFE0F",
-    "CutCraft": "\u2702\uFE0F",
-}
-
-
-def _find_medoid(group):
-    """Find the TRUE geometric medoid: the real pitcher that minimizes
+# Columns read from each year's pitcher_seasons.parquet (everything else is skipped)
+PARQUET_COLUMNS = [
+    "pitcher", "player_name", "game_year", "is_rhp", "is_sp", "archetype",
+    "sub_archetype", "archetype_dna", "pca_x", "pca_y", "pca_z", "avg_velo_FF",
+    "whiff_rate", "arm_angle", "pfx_x_avg", "pfx_z_avg", "total_pitches",
+]
+# Columns carried into each pitcher_seasons.json record
+RECORD_COLUMNS = [
+    "pitcher", "player_name", "game_year", "is_rhp", "is_sp", "archetype_key",
+    "archetype", "sub_archetype", "archetype_dna", "pca_x", "pca_y", "pca_z",
+    "avg_velo_FF", "whiff_rate", "arm_angle", "pfx_x_avg", "pfx_z_avg",
+]
+# Columns the cluster-profile pass reads from the combined frame
+CLUSTER_COLUMNS = ["archetype_key", "is_sp", "pca_x", "pca_y", "pca_z"]
+# Narrow dtypes for the retained cluster columns (records are built before downcasting)
+CLUSTER_DTYPES = {"is_sp": "float32", "pca_x": "float32", "pca_y": "float32", "pca_z": "float32"}
+# NaN-prone record columns that export as 0
+ZERO_FILL_COLUMNS = ["pitcher", "avg_velo_FF", "whiff_rate", "arm_angle", "pfx_x_avg", "pfx_z_avg"]
+
+# Largest archetype group that still gets the exact O(N^2) medoid
+MEDOID_EXACT_MAX = 512
+# Year parquets decoded ahead of the year being exported (bounds frames held in memory)
+READ_AHEAD = 2
+
+
+def _centroid_medoids(keys, coords):
+    """Centroid-nearest pitcher for every group of a frame sorted by key, in one
+    NumPy pass (no per-group Python iteration, no distance matrix).
+
+    keys: (N,) sorted group keys; coords: (N, 3) PCA coordinates.
+    Returns {key: position of the medoid within its group}."""
+    uniq, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+    centroids = np.add.reduceat(coords, starts, axis=0) / counts[:, None]
+    diff = coords - np.repeat(centroids, counts, axis=0)
+    sq_dists = np.einsum("ij,ij->i", diff, diff)
+
+    # Sort by (group, distance): the first entry of each segment is its argmin
+    seg_ids = np.repeat(np.arange(len(uniq)), counts)
+    nearest = np.lexsort((sq_dists, seg_ids))[starts]
+    return {key: int(pos - start) for key, pos, start in zip(uniq, nearest, starts)}
+
+
+def _find_medoid(group, centroid_idx=None):
+    """Find the geometric medoid: the real pitcher that minimizes
     sum of distances to all other pitchers in PCA space.
-    Returns (pca_x, pca_y, pca_z, medoid_row)."""
-    from scipy.spatial.distance import cdist
 
-    coords = group[["pca_x", "pca_y", "pca_z"]].values
+    Groups of MEDOID_EXACT_MAX or more use centroid_idx, the pitcher nearest
+    the centroid (minimizes the sum of SQUARED distances), precomputed by
+    _centroid_medoids.
+    Returns (pca_x, pca_y, pca_z, medoid_row)."""
+    # float64: the cluster frame is float32, too coarse for the Gram-matrix distances
+    coords = group[["pca_x", "pca_y", "pca_z"]].to_numpy(dtype=np.float64)
     if len(coords) < 2:
         row = group.iloc[0]
         return float(row.pca_x), float(row.pca_y), float(row.pca_z), row
 
-    dist_matrix = cdist(coords, coords, metric='euclidean')
-    total_dists = dist_matrix.sum(axis=1)
-    medoid_idx = int(np.argmin(total_dists))
+    if len(coords) < MEDOID_EXACT_MAX or centroid_idx is None:
+        # Pairwise distances via the Gram matrix (||a||² + ||b||² - 2a·b) so the
+        # heavy lifting is one BLAS matmul; centering first limits cancellation
+        centered = coords - coords.mean(axis=0)
+        sq_norms = np.einsum("ij,ij->i", centered, centered)
+        sq_dists = sq_norms[:, None] + sq_norms[None, :] - 2.0 * (centered @ centered.T)
+        total_dists = np.sqrt(np.maximum(sq_dists, 0.0)).sum(axis=1)
+        medoid_idx = int(np.argmin(total_dists))
+    else:
+        medoid_idx = centroid_idx
     row = group.iloc[medoid_idx]
     return float(row.pca_x), float(row.pca_y), float(row.pca_z), row
 
 
+def _load_json(path):
+    """Decode a JSON file with orjson (file handle closed deterministically)."""
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def _scan_year_dirs():
+    """Map year -> (year_dir, file names in it), listing MODELS_DIR once
+    instead of stat()-ing each expected path per year."""
+    if not os.path.isdir(MODELS_DIR):
+        return {}
+    year_dirs = {}
+    with os.scandir(MODELS_DIR) as entries:
+        for entry in entries:
+            if entry.is_dir() and entry.name.isdigit():
+                year_dirs[int(entry.name)] = (entry.path, set(os.listdir(entry.path)))
+    return year_dirs
+
+
+def _read_season_parquet(parquet_path):
+    """Read one year's pitcher_seasons.parquet projected to PARQUET_COLUMNS.
+    Returns None when parquet_path is None (year has no parquet)."""
+    if parquet_path is None:
+        return None
+
+    # Optional columns may be absent in older outputs
+    available = set(pq.read_schema(parquet_path).names)
+    return pd.read_parquet(
+        parquet_path,
+        columns=[c for c in PARQUET_COLUMNS if c in available],
+        engine="pyarrow",
+    )
+
+
+def _prefetch_map(pool, fn, items, ahead):
+    """pool.map in order, but with at most `ahead` calls running beyond the
+    result being consumed, so finished-but-unread results stay bounded."""
+    in_flight = deque()
+    for item in items:
+        in_flight.append(pool.submit(fn, item))
+        if len(in_flight) > ahead:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def _pitcher_season_records(df):
+    """Round/cast one year's pitcher-seasons column-wise and return JSON-ready records."""
+    # Optional columns may be missing from older model outputs
+    if "sub_archetype" not in df.columns:
+        df["sub_archetype"] = "Pure"
+    if "archetype_dna" not in df.columns:
+        df["archetype_dna"] = df["archetype"]
+    for col in ("arm_angle", "pfx_x_avg", "pfx_z_avg"):
+        if col not in df.columns:
+            df[col] = 0.0
+
+    rec_df = df[RECORD_COLUMNS].fillna({col: 0 for col in ZERO_FILL_COLUMNS})
+
+    def rounded(col, ndigits):
+        # Python round() per value, not ndarray.round(): numpy's scale-round-unscale
+        # can land a tie on the other side (88.55 -> 88.6 instead of 88.5)
+        return [round(v, ndigits) for v in rec_df[col].to_numpy(dtype=np.float64).tolist()]
+
+    # ndarray.tolist() converts a whole column to Python scalars in C; zipping the
+    # columns avoids to_dict's per-value boxing and any per-field float()/int()
+    cols = {
+        "pitcher": rec_df["pitcher"].to_numpy(dtype=np.int64).tolist(),
+        "player_name": rec_df["player_name"].astype(str).tolist(),
+        "game_year": rec_df["game_year"].to_numpy(dtype=np.int64).tolist(),
+        "is_rhp": rec_df["is_rhp"].to_numpy(dtype=np.int64).tolist(),
+        "is_sp": rounded("is_sp", 3),
+        "cluster": rec_df["archetype_key"].tolist(),
+        "archetype": rec_df["archetype"].astype(str).tolist(),
+        "sub_archetype": rec_df["sub_archetype"].astype(str).tolist(),
+        "archetype_dna": rec_df["archetype_dna"].astype(str).tolist(),
+        "pca_x": rounded("pca_x", 4),
+        "pca_y": rounded("pca_y", 4),
+        "pca_z": rounded("pca_z", 4),
+        "avg_velo_FF": rounded("avg_velo_FF", 1),
+        "whiff_rate": rounded("whiff_rate", 4),
+        "arm_angle": rounded("arm_angle", 1),
+        "pfx_x_avg": rounded("pfx_x_avg", 4),
+        "pfx_z_avg": rounded("pfx_z_avg", 4),
+    }
+    names = list(cols)
+    return [dict(zip(names, row)) for row in zip(*cols.values())]
+
+
 def export_all():
     print("=" * 60)
     print("  EXPORTING FRONTEND DATA (NO CENTROIDS)")
     print("=" * 60)
 
-    all_pitcher_seasons = []
     all_dfs = []
     all_profiles = {}  # merged from per-year cluster_profiles.json
+    key_examples = {}  # archetype_key -> (latest year, top-3 player names that year)
 
-    for year in YEARS:
-        year_dir = os.path.join(MODELS_DIR, str(year))
-        parquet_path = os.path.join(year_dir, "pitcher_seasons.parquet")
-
-        if not os.path.exists(parquet_path):
-            print(f"  SKIP {year}: no parquet found")
-            continue
-
-        df = pd.read_parquet(parquet_path)
-        print(f"  {year}: {len(df)} pitcher-seasons")
-
-        # Load pipeline profiles (traits from individual pitcher stats)
-        profiles_path = os.path.join(year_dir, "cluster_profiles.json")
-        if os.path.exists(profiles_path):
-            year_profiles = json.load(open(profiles_path))
-            for key, prof in year_profiles.items():
-                if key not in all_profiles:
-                    all_profiles[key] = prof
-                else:
-                    # Keep most recent year's profile (last year wins)
-                    all_profiles[key] = prof
-
-        # Build archetype key
-        df["archetype_key"] = df.apply(
-            lambda r: f"{'RHP' if r.is_rhp == 1 else 'LHP'}_{r.archetype}", axis=1
-        )
-        all_dfs.append(df)
-
-        # Export pitcher-season records
-        for _, r in df.iterrows():
-            rec = {
-                "pitcher": int(r.pitcher) if pd.notna(r.pitcher) else 0,
-                "player_name": str(r.player_name),
-                "game_year": int(r.game_year),
-                "is_rhp": int(r.is_rhp),
-                "is_sp": round(float(r.is_sp), 3),
-                "cluster": r.archetype_key,
-                "archetype": str(r.archetype),
-                "sub_archetype": str(r.get("sub_archetype", "Pure")),
-                "archetype_dna": str(r.get("archetype_dna", r.archetype)),
-                "pca_x": round(float(r.pca_x), 4),
-                "pca_y": round(float(r.pca_y), 4),
-                "pca_z": round(float(r.pca_z), 4),
-                "avg_velo_FF": round(float(r.avg_velo_FF), 1) if pd.notna(r.avg_velo_FF) else 0,
-                "whiff_rate": round(float(r.whiff_rate), 4) if pd.notna(r.whiff_rate) else 0,
-                "arm_angle": round(float(r.arm_angle), 1) if pd.notna(r.get("arm_angle", None)) else 0,
-                "pfx_x_avg": round(float(r.pfx_x_avg), 4) if pd.notna(r.get("pfx_x_avg", None)) else 0,
-                "pfx_z_avg": round(float(r.pfx_z_avg), 4) if pd.notna(r.get("pfx_z_avg", None)) else 0,
-            }
-            all_pitcher_seasons.append(rec)
+    # pitcher_seasons.json is streamed year by year into a temp file so only
+    # one year's records are ever held in memory; renamed into place at the end
+    os.makedirs(FRONTEND_DATA_DIR, exist_ok=True)
+    ps_path = os.path.join(FRONTEND_DATA_DIR, "pitcher_seasons.json")
+    ps_tmp_path = ps_path + ".tmp"
+    n_pitcher_seasons = 0
+
+    with open(ps_tmp_path, "wb") as ps_file, ThreadPoolExecutor(max_workers=READ_AHEAD) as pool:
+        ps_file.write(b"[")
+
+        year_dirs = _scan_year_dirs()
+        parquet_paths = []
+        for year in YEARS:
+            year_dir, year_files = year_dirs.get(year, (None, ()))
+            if "pitcher_seasons.parquet" in year_files:
+                parquet_paths.append(os.path.join(year_dir, "pitcher_seasons.parquet"))
+            else:
+                parquet_paths.append(None)
+
+        # Parquet decode releases the GIL: read the next years while this one
+        # is exported, but only READ_AHEAD ahead so frames don't pile up
+        frames = _prefetch_map(pool, _read_season_parquet, parquet_paths, READ_AHEAD)
+        for year, df in zip(YEARS, frames):
+            if df is None:
+                print(f"  SKIP {year}: no parquet found")
+                continue
+
+            print(f"  {year}: {len(df)} pitcher-seasons")
+
+            # Load pipeline profiles (traits from individual pitcher stats)
+            year_dir, year_files = year_dirs[year]
+            if "cluster_profiles.json" in year_files:
+                year_profiles = _load_json(os.path.join(year_dir, "cluster_profiles.json"))
+                for key, prof in year_profiles.items():
+                    if key not in all_profiles:
+                        all_profiles[key] = prof
+                    else:
+                        # Keep most recent year's profile (last year wins)
+                        all_profiles[key] = prof
+
+            # Build archetype key
+            df["archetype_key"] = (
+                np.where(df["is_rhp"].to_numpy() == 1, "RHP_", "LHP_").astype(object)
+                + df["archetype"].astype(str).to_numpy(dtype=object)
+            )
+
+            # Export pitcher-season records: strip the array brackets and splice in
+            records = _pitcher_season_records(df)
+            if records:
+                if n_pitcher_seasons:
+                    ps_file.write(b",")
+                ps_file.write(orjson.dumps(records, option=orjson.OPT_SERIALIZE_NUMPY)[1:-1])
+                n_pitcher_seasons += len(records)
+
+            # Example pitchers: YEARS ascend, so this year's top 3 by pitches
+            # replaces any earlier year's for every key present this year
+            year_top = (
+                df.dropna(subset=["total_pitches"])
+                .sort_values("total_pitches", ascending=False, kind="mergesort")
+                .groupby("archetype_key", sort=False)
+                .head(3)
+            )
+            for key in df["archetype_key"].unique():
+                key_examples[key] = (year, [])
+            for key, names in year_top.groupby("archetype_key", sort=False)["player_name"]:
+                key_examples[key] = (year, names.tolist())
+
+            # Keep only what the medoid/role pass needs; the full frame is released
+            all_dfs.append(df[CLUSTER_COLUMNS].astype(CLUSTER_DTYPES))
+            del df, records, year_top
+
+        ps_file.write(b"]")
 
     if not all_dfs:
+        os.remove(ps_tmp_path)
         print("  ERROR: No data found!")
         return
 
+    os.replace(ps_tmp_path, ps_path)
+
     # ── Combine all years into one DataFrame ──
     combined = pd.concat(all_dfs, ignore_index=True)
+    all_dfs.clear()
+    # Categorical key: groupby/sort hash small int codes instead of Python strings
+    combined["archetype_key"] = combined["archetype_key"].astype("category")
+    combined = combined.sort_values("archetype_key", kind="mergesort", ignore_index=True)
+    centroid_medoids = _centroid_medoids(
+        combined["archetype_key"].to_numpy(),
+        combined[["pca_x", "pca_y", "pca_z"]].to_numpy(dtype=np.float64),
+    )
+
+    # Display metadata mapped once over the key categories, not looked up per group
+    key_cats = combined["archetype_key"].cat.categories
+    key_names = key_cats.str.split("_", n=1).str[1]
+    key_emoji = dict(zip(key_cats, key_names.map(EMOJI_MAP).fillna("")))
+    key_color = dict(zip(key_cats, key_names.map(ARCHETYPE_COLORS).fillna("#888888")))
 
     # ── Build cluster profiles (NO CENTROIDS) ──
     clusters_out = {}
 
-    for key, group in combined.groupby("archetype_key"):
+    for key, group in combined.groupby("archetype_key", sort=False, observed=True):
         parts = key.split("_", 1)
         hand = parts[0]
         archetype_name = parts[1]
 
-        # PCA position: true geometric medoid (real pitcher, not closest-to-mean)
-        med_x, med_y, med_z, medoid_row = _find_medoid(group)
+        # PCA position: geometric medoid (real pitcher, not a phantom average)
+        med_x, med_y, med_z, medoid_row = _find_medoid(group, centroid_medoids[key])
 
         # Get traits from pipeline profiles (individual pitcher stats, NOT centroid averages)
         prof = all_profiles.get(key, {})
@@ -173,13 +320,11 @@ def export_all():
             role = "SW"
 
         # Example pitchers from most recent year
-        max_year = int(group["game_year"].max())
-        recent = group[group["game_year"] == max_year]
-        examples = recent.nlargest(min(3, len(recent)), "total_pitches")["player_name"].tolist()
+        max_year, examples = key_examples[key]
         example_strs = [f"{name} ({max_year})" for name in examples]
 
-        emoji = EMOJI_MAP.get(archetype_name, "")
-        color = ARCHETYPE_COLORS.get(archetype_name, "#888888")
+        emoji = key_emoji[key]
+        color = key_color[key]
         short_name = f"{emoji} {archetype_name} {role}"
 
         clusters_out[key] = {
@@ -202,17 +347,12 @@ def export_all():
         }
 
     # ── Save ──
-    os.makedirs(FRONTEND_DATA_DIR, exist_ok=True)
-
     clusters_path = os.path.join(FRONTEND_DATA_DIR, "clusters.json")
-    with open(clusters_path, "w") as f:
-        json.dump(clusters_out, f, indent=2, ensure_ascii=False)
+    with open(clusters_path, "wb") as f:
+        f.write(orjson.dumps(clusters_out, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
     print(f"\n  clusters.json: {len(clusters_out)} archetypes -> {clusters_path}")
 
-    ps_path = os.path.join(FRONTEND_DATA_DIR, "pitcher_seasons.json")
-    with open(ps_path, "w") as f:
-        json.dump(all_pitcher_seasons, f, ensure_ascii=False)
-    print(f"  pitcher_seasons.json: {len(all_pitcher_seasons)} records -> {ps_path}")
+    print(f"  pitcher_seasons.json: {n_pitcher_seasons} records -> {ps_path}")
 
     print(f"\n  NOTE: hitter_vs_cluster.json needs re-generation with new archetype keys.")
     print(f"  DONE! Frontend data exported.")
@@ -1,9 +1,10 @@
 """
-Pipeline orchestrator: runs all steps in sequence.
+Pipeline orchestrator: runs all steps, overlapping the ones that don't depend on each other.
 
 Usage:
     python pipeline/run_all.py           # Run all steps
     python pipeline/run_all.py --from 3  # Resume from step 3
+    python pipeline/run_all.py --jobs 1  # Strictly one step at a time
 """
 
 import subprocess
@@ -11,6 +12,7 @@ import sys
 import os
 import argparse
 import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 STEPS = [
     ("01_fetch_statcast.py", "Fetch Statcast data"),
@@ -23,14 +25,60 @@ STEPS = [
     ("08_hitter_timing.py", "Compute hitter timing archetypes"),
 ]
 
+# Step number -> step numbers whose outputs it reads.
+#   02 reads raw Statcast (01); 03 reads raw + roles; 04-05 refine pitcher_seasons;
+#   06 and 07 only read clustered pitcher_seasons + raw, so they can overlap;
+#   08 reads the pitcher_seasons.json that 06 copies to frontend/public.
+DEPENDS_ON = {
+    1: [],
+    2: [1],
+    3: [1, 2],
+    4: [3],
+    5: [4],
+    6: [5],
+    7: [5],
+    8: [6],
+}
+
 PIPELINE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
+def run_step(step_num, prefix_output=False):
+    """Run one pipeline script in a subprocess. Returns (step_num, returncode, elapsed).
+
+    With prefix_output, the script's stdout/stderr is streamed line by line
+    as "[NN] ..." so overlapping steps stay readable."""
+    script, desc = STEPS[step_num - 1]
+    script_path = os.path.join(PIPELINE_DIR, script)
+    print(f"\n{'='*60}")
+    print(f"Step {step_num}/{len(STEPS)}: {desc}")
+    print(f"Script: {script}")
+    print(f"{'='*60}\n", flush=True)
+
+    start_time = time.time()
+    cmd = [sys.executable, script_path]
+    cwd = os.path.dirname(PIPELINE_DIR)  # project root
+    if not prefix_output:
+        returncode = subprocess.run(cmd, cwd=cwd).returncode
+    else:
+        env = dict(os.environ, PYTHONUNBUFFERED="1")  # lines as they happen, not in 8 KB blocks
+        with subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.PIPE,
+                              stderr=subprocess.STDOUT, text=True) as proc:
+            for line in proc.stdout:
+                print(f"[{step_num:02d}] {line}", end="", flush=True)
+        returncode = proc.returncode
+    return step_num, returncode, time.time() - start_time
+
+
 def main():
     parser = argparse.ArgumentParser(description="Run the MLB Pitcher Archetype pipeline")
     parser.add_argument(
         "--from", dest="start_step", type=int, default=1,
-        help="Step number to start from (1-6). Default: 1",
+        help=f"Step number to start from (1-{len(STEPS)}). Default: 1",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=2,
+        help="Max steps to run at once when their dependencies allow. Default: 2",
     )
     args = parser.parse_args()
 
@@ -39,35 +87,43 @@ def main():
         print(f"Invalid step number. Must be 1-{len(STEPS)}")
         sys.exit(1)
 
-    steps_to_run = STEPS[start_idx:]
+    steps_to_run = list(range(args.start_step, len(STEPS) + 1))
     print(f"Running {len(steps_to_run)} pipeline steps:")
-    for i, (script, desc) in enumerate(steps_to_run, start=start_idx + 1):
+    for i in steps_to_run:
+        script, desc = STEPS[i - 1]
         print(f"  {i}. {desc} ({script})")
     print()
 
-    for i, (script, desc) in enumerate(steps_to_run, start=start_idx + 1):
-        script_path = os.path.join(PIPELINE_DIR, script)
-        print(f"\n{'='*60}")
-        print(f"Step {i}/{len(STEPS)}: {desc}")
-        print(f"Script: {script}")
-        print(f"{'='*60}\n")
-
-        start_time = time.time()
-
-        try:
-            result = subprocess.run(
-                [sys.executable, script_path],
-                check=True,
-                cwd=os.path.dirname(PIPELINE_DIR),  # project root
-            )
-        except subprocess.CalledProcessError as e:
-            print(f"\nFAILED at step {i}: {script}")
-            print(f"Exit code: {e.returncode}")
-            print(f"Resume with: python pipeline/run_all.py --from {i}")
-            sys.exit(e.returncode)
-
-        elapsed = time.time() - start_time
-        print(f"\nCompleted step {i} in {elapsed:.1f}s")
+    # Steps before --from are treated as already complete
+    done = set(range(1, args.start_step))
+    pending = list(steps_to_run)
+    running = {}
+
+    # Output of concurrent steps is line-prefixed with its step number
+    jobs = max(1, args.jobs)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            # Launch every pending step whose dependencies are complete
+            for i in list(pending):
+                if len(running) >= jobs:
+                    break
+                if all(dep in done for dep in DEPENDS_ON[i]):
+                    pending.remove(i)
+                    running[pool.submit(run_step, i, jobs > 1)] = i
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                del running[future]
+                i, returncode, elapsed = future.result()
+                if returncode != 0:
+                    # Let any overlapping step finish before reporting
+                    wait(running)
+                    print(f"\nFAILED at step {i}: {STEPS[i - 1][0]}")
+                    print(f"Exit code: {returncode}")
+                    print(f"Resume with: python pipeline/run_all.py --from {i}")
+                    sys.exit(returncode)
+                done.add(i)
+                print(f"\nCompleted step {i} in {elapsed:.1f}s")
 
     print(f"\n{'='*60}")
     print("Pipeline complete!")
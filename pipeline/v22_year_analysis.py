@@ -3,8 +3,8 @@ v22: Per-Year Clustering Analysis
 
 Runs a THOROUGH analysis for a single year:
   1) Feature diagnostics: correlation matrix, VIF, feature distributions
-  2) Drop-one silhouette analysis: which features help/hurt clustering?
-  3) KMeans clustering (RHP/LHP separately)
+  2) KMeans clustering (RHP/LHP separately)
+  3) Drop-one silhouette analysis at each hand's chosen K: which features help/hurt?
   4) Cluster profiling with our naming convention
   5) Comparison summary for user review
 
@@ -19,17 +19,20 @@ import argparse
 import warnings
 import pandas as pd
 import numpy as np
-import joblib
+from joblib import Parallel, delayed
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from threadpoolctl import threadpool_limits
 
 from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.metrics import silhouette_score, silhouette_samples
 from sklearn.decomposition import PCA
-from statsmodels.stats.outliers_influence import variance_inflation_factor
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import PROCESSED_DATA_DIR, MODELS_DIR, CLUSTER_FEATURES, K_RANGE, RANDOM_STATE
+from config import (
+    PROCESSED_DATA_DIR, MODELS_DIR, CLUSTER_FEATURES, K_RANGE, RANDOM_STATE, EMOJI_MAP,
+)
 
 # Features to use for clustering -- remove is_rhp since we split by hand
 HAND_CLUSTER_FEATURES = [f for f in CLUSTER_FEATURES if f != "is_rhp"]
@@ -37,77 +40,122 @@ HAND_CLUSTER_FEATURES = [f for f in CLUSTER_FEATURES if f != "is_rhp"]
 MIN_K = 4  # Lower floor for single-year (fewer pitchers)
 MAX_K = 15
 X_OFFSET = 5.0
+SIL_SAMPLE = 1024  # Silhouette sample size while searching K (exact score on chosen K)
+MEDOID_EXACT_MAX = 2000  # Above this, medoid = member nearest the centroid
+MEDOID_CHUNK = 512       # Rows per distance block in the exact medoid search
 
 warnings.filterwarnings("ignore", category=RuntimeWarning)
 
 
+def _kmeans(k):
+    """Full KMeans for every silhouette that gets reported (K search, drop-one
+    baseline and feature drops). MiniBatch labels shift these scores too much."""
+    return KMeans(n_clusters=k, n_init=10, max_iter=300, random_state=RANDOM_STATE)
+
+
+def _fast_kmeans(k, n_samples):
+    """MiniBatchKMeans, only for the drop-one K search when no K is passed in.
+    Its scores rank candidates; the chosen K is then re-fit with _kmeans."""
+    return MiniBatchKMeans(
+        n_clusters=k, batch_size=min(256, n_samples), n_init=3, max_iter=100,
+        reassignment_ratio=0.01, random_state=RANDOM_STATE,
+    )
+
+
+def _search_silhouette(X, labels):
+    """Sampled silhouette estimate, used only to rank K candidates."""
+    return silhouette_score(X, labels, sample_size=min(len(X), SIL_SAMPLE), random_state=RANDOM_STATE)
+
+
+def _flush(buf):
+    """Write a section's buffered lines to stdout in one call."""
+    sys.stdout.write("\n".join(buf) + "\n")
+    sys.stdout.flush()
+
+
+def _prep(df, features, dtype=np.float64):
+    """Feature matrix with NaN and +/-inf zeroed, cleaned in place (one copy)."""
+    X = df[features].to_numpy(dtype=dtype, copy=True)
+    np.nan_to_num(X, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    return X
+
+
+def _scaled(df, features, dtype=np.float32):
+    """Standardized, clipped feature matrix and its fitted scaler.
+    fp32 halves memory traffic for KMeans/silhouette; pass np.float64 where
+    the values themselves are saved (PCA coordinates)."""
+    X_scaled = _prep(df, features, dtype=dtype)
+    scaler = StandardScaler(copy=False)
+    X_scaled = scaler.fit_transform(X_scaled)
+    np.clip(X_scaled, -10, 10, out=X_scaled)
+    np.nan_to_num(X_scaled, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    return X_scaled, scaler
+
+
 # ═══════════════════════════════════════════════════════════════
 # 1. FEATURE DIAGNOSTICS
 # ═══════════════════════════════════════════════════════════════
 
 def feature_diagnostics(df, features, label="ALL"):
     """Compute correlation matrix, VIF, and basic stats for the feature set."""
-    print(f"\n{'='*60}")
-    print(f"  FEATURE DIAGNOSTICS — {label}")
-    print(f"{'='*60}")
+    buf = []
+    _p = buf.append
+    _p(f"\n{'='*60}")
+    _p(f"  FEATURE DIAGNOSTICS — {label}")
+    _p(f"{'='*60}")
 
-    X = df[features].fillna(0).values
-    X = np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
+    X = _prep(df, features)
 
     # Basic stats
-    print(f"\n  Pitcher-seasons: {len(df):,}")
-    print(f"  Features: {len(features)}")
-
-    stats = df[features].describe().T[["mean", "std", "min", "max"]]
-    print(f"\n  Feature Distributions:")
-    print(f"  {'Feature':<25} {'Mean':>8} {'Std':>8} {'Min':>8} {'Max':>8} {'Zero%':>8}")
-    print(f"  {'-'*73}")
-    for feat in features:
-        col = df[feat].fillna(0)
-        zero_pct = (col == 0).mean() * 100
-        print(f"  {feat:<25} {col.mean():>8.3f} {col.std():>8.3f} {col.min():>8.3f} {col.max():>8.3f} {zero_pct:>7.1f}%")
+    _p(f"\n  Pitcher-seasons: {len(df):,}")
+    _p(f"  Features: {len(features)}")
+
+    # One (F, 5) matrix of mean/std/min/max/zero% straight off X
+    stats = np.stack([
+        X.mean(axis=0), X.std(axis=0, ddof=1), X.min(axis=0), X.max(axis=0),
+        (X == 0).mean(axis=0) * 100,
+    ], axis=1)
+    _p(f"\n  Feature Distributions:")
+    _p(f"  {'Feature':<25} {'Mean':>8} {'Std':>8} {'Min':>8} {'Max':>8} {'Zero%':>8}")
+    _p(f"  {'-'*73}")
+    for i, feat in enumerate(features):
+        mean, std, lo, hi, zero_pct = stats[i]
+        _p(f"  {feat:<25} {mean:>8.3f} {std:>8.3f} {lo:>8.3f} {hi:>8.3f} {zero_pct:>7.1f}%")
 
     # Correlation matrix — find high correlations
     corr = df[features].fillna(0).corr()
-    print(f"\n  High Correlations (|r| > 0.5):")
-    print(f"  {'Feature 1':<25} {'Feature 2':<25} {'r':>8}")
-    print(f"  {'-'*60}")
-    pairs_found = 0
-    for i in range(len(features)):
-        for j in range(i+1, len(features)):
-            r = corr.iloc[i, j]
-            if abs(r) > 0.5:
-                print(f"  {features[i]:<25} {features[j]:<25} {r:>8.3f}")
-                pairs_found += 1
-    if pairs_found == 0:
-        print(f"  (none)")
+    _p(f"\n  High Correlations (|r| > 0.5):")
+    _p(f"  {'Feature 1':<25} {'Feature 2':<25} {'r':>8}")
+    _p(f"  {'-'*60}")
+    iu, ju = np.triu_indices(len(features), k=1)
+    rvals = corr.to_numpy()[iu, ju]
+    hits = np.flatnonzero(np.abs(rvals) > 0.5)
+    for idx in hits:
+        _p(f"  {features[iu[idx]]:<25} {features[ju[idx]]:<25} {rvals[idx]:>8.3f}")
+    if len(hits) == 0:
+        _p(f"  (none)")
 
     # VIF
-    print(f"\n  Variance Inflation Factors (VIF):")
-    print(f"  {'Feature':<25} {'VIF':>10}")
-    print(f"  {'-'*37}")
-
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    X_scaled = np.clip(X_scaled, -10, 10)
-    X_scaled = np.nan_to_num(X_scaled, nan=0.0, posinf=0.0, neginf=0.0)
-
-    # Add small noise to prevent singular matrix
-    X_vif = X_scaled + np.random.normal(0, 1e-6, X_scaled.shape)
-
-    vif_results = []
-    for i, feat in enumerate(features):
-        try:
-            vif = variance_inflation_factor(X_vif, i)
-            vif_results.append((feat, vif))
-        except Exception as e:
-            vif_results.append((feat, float('nan')))
+    _p(f"\n  Variance Inflation Factors (VIF):")
+    _p(f"  {'Feature':<25} {'VIF':>10}")
+    _p(f"  {'-'*37}")
+
+    # VIF_i = (R^-1)_ii for correlation matrix R: one inversion instead of F OLS fits.
+    # Constant columns (NaN correlations) are treated as uncorrelated.
+    R = np.nan_to_num(corr.to_numpy())
+    np.fill_diagonal(R, 1.0)
+    try:
+        vifs = np.diag(np.linalg.inv(R + 1e-8 * np.eye(len(features))))
+    except np.linalg.LinAlgError:
+        vifs = np.full(len(features), np.nan)
+    vif_results = list(zip(features, vifs.tolist()))
 
     vif_results.sort(key=lambda x: x[1] if not np.isnan(x[1]) else 0, reverse=True)
     for feat, vif in vif_results:
         flag = " *** HIGH" if vif > 10 else (" ** MODERATE" if vif > 5 else "")
-        print(f"  {feat:<25} {vif:>10.2f}{flag}")
+        _p(f"  {feat:<25} {vif:>10.2f}{flag}")
 
+    _flush(buf)
     return corr, vif_results
 
 
@@ -115,61 +163,54 @@ def feature_diagnostics(df, features, label="ALL"):
 # 2. DROP-ONE SILHOUETTE ANALYSIS
 # ═══════════════════════════════════════════════════════════════
 
+def _eval_drop(i, X_scaled, k):
+    """Silhouette with feature column i dropped.
+
+    Standardization and clipping are per-column, so the drop-one matrix is just
+    X_scaled without column i (no re-scaling needed)."""
+    X_drop_scaled = np.delete(X_scaled, i, axis=1)
+    labels_drop = _kmeans(k).fit_predict(X_drop_scaled)
+    return silhouette_score(X_drop_scaled, labels_drop)
+
+
 def drop_one_analysis(df, features, label="ALL", k=None):
     """For each feature, drop it and compare silhouette score."""
-    print(f"\n{'='*60}")
-    print(f"  DROP-ONE SILHOUETTE — {label} (n={len(df):,})")
-    print(f"{'='*60}")
-
-    X = df[features].fillna(0).values
-    X = np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
+    buf = []
+    _p = buf.append
+    _p(f"\n{'='*60}")
+    _p(f"  DROP-ONE SILHOUETTE — {label} (n={len(df):,})")
+    _p(f"{'='*60}")
 
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    X_scaled = np.clip(X_scaled, -10, 10)
-    X_scaled = np.nan_to_num(X_scaled, nan=0.0, posinf=0.0, neginf=0.0)
+    X_scaled, _ = _scaled(df, features)
 
     # Baseline: all features
     if k is None:
         # Quick search for optimal K
         best_k, best_sil = MIN_K, 0
         for test_k in range(MIN_K, MAX_K + 1):
-            km = KMeans(n_clusters=test_k, n_init=10, max_iter=300, random_state=RANDOM_STATE)
+            km = _fast_kmeans(test_k, len(X_scaled))
             labels = km.fit_predict(X_scaled)
-            sil = silhouette_score(X_scaled, labels)
+            sil = _search_silhouette(X_scaled, labels)
             if sil > best_sil:
                 best_k, best_sil = test_k, sil
         k = best_k
-        print(f"  Optimal K for baseline: {k} (sil={best_sil:.4f})")
+        _p(f"  Optimal K for baseline: {k} (sil={best_sil:.4f})")
 
-    km = KMeans(n_clusters=k, n_init=10, max_iter=300, random_state=RANDOM_STATE)
+    km = _kmeans(k)
     labels = km.fit_predict(X_scaled)
     baseline_sil = silhouette_score(X_scaled, labels)
-    print(f"  Baseline silhouette (all {len(features)} features, K={k}): {baseline_sil:.4f}")
-
-    # Drop each feature
-    results = []
-    for i, feat in enumerate(features):
-        remaining = [f for f in features if f != feat]
-        X_drop = df[remaining].fillna(0).values
-        X_drop = np.nan_to_num(X_drop, nan=0.0, posinf=0.0, neginf=0.0)
+    _p(f"  Baseline silhouette (all {len(features)} features, K={k}): {baseline_sil:.4f}")
 
-        scaler_drop = StandardScaler()
-        X_drop_scaled = scaler_drop.fit_transform(X_drop)
-        X_drop_scaled = np.clip(X_drop_scaled, -10, 10)
-        X_drop_scaled = np.nan_to_num(X_drop_scaled, nan=0.0, posinf=0.0, neginf=0.0)
-
-        km_drop = KMeans(n_clusters=k, n_init=10, max_iter=300, random_state=RANDOM_STATE)
-        labels_drop = km_drop.fit_predict(X_drop_scaled)
-        sil_drop = silhouette_score(X_drop_scaled, labels_drop)
-
-        delta = sil_drop - baseline_sil
-        results.append((feat, sil_drop, delta))
+    # Drop each feature -- independent fits, so run them across cores
+    sils = Parallel(n_jobs=-1, backend="loky")(
+        delayed(_eval_drop)(i, X_scaled, k) for i in range(len(features))
+    )
+    results = [(feat, sil_drop, sil_drop - baseline_sil) for feat, sil_drop in zip(features, sils)]
 
     # Sort by delta (positive = dropping IMPROVES clustering)
     results.sort(key=lambda x: x[2], reverse=True)
-    print(f"\n  {'Feature':<25} {'Sil w/o':>10} {'Delta':>10} {'Impact':>20}")
-    print(f"  {'-'*67}")
+    _p(f"\n  {'Feature':<25} {'Sil w/o':>10} {'Delta':>10} {'Impact':>20}")
+    _p(f"  {'-'*67}")
     for feat, sil, delta in results:
         if delta > 0.01:
             impact = "DROP CANDIDATE"
@@ -181,8 +222,9 @@ def drop_one_analysis(df, features, label="ALL", k=None):
             impact = "useful"
         else:
             impact = "neutral"
-        print(f"  {feat:<25} {sil:>10.4f} {delta:>+10.4f} {impact:>20}")
+        _p(f"  {feat:<25} {sil:>10.4f} {delta:>+10.4f} {impact:>20}")
 
+    _flush(buf)
     return baseline_sil, k, results
 
 
@@ -190,34 +232,36 @@ def drop_one_analysis(df, features, label="ALL", k=None):
 # 3. KMEANS CLUSTERING
 # ═══════════════════════════════════════════════════════════════
 
-def cluster_single_year(df, features, year, prefix, label):
-    """Full KMeans clustering for one hand in one year."""
-    print(f"\n{'='*60}")
-    print(f"  CLUSTERING {label} — {year} (n={len(df):,})")
-    print(f"{'='*60}")
+def _fit_k(k, X_scaled):
+    """One K-search candidate: full KMeans fit + silhouette."""
+    km = _kmeans(k)
+    labels = km.fit_predict(X_scaled)
+    return {"k": k, "silhouette": _search_silhouette(X_scaled, labels), "inertia": km.inertia_}
 
-    X = df[features].fillna(0).values
-    X = np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
 
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    X_scaled = np.clip(X_scaled, -10, 10)
-    X_scaled = np.nan_to_num(X_scaled, nan=0.0, posinf=0.0, neginf=0.0)
+def cluster_single_year(df, features, year, prefix, label):
+    """Full KMeans clustering for one hand in one year.
+    Returns (df, models, k_results, log lines); the caller prints the log."""
+    buf = []
+    _p = buf.append
+    _p(f"\n{'='*60}")
+    _p(f"  CLUSTERING {label} — {year} (n={len(df):,})")
+    _p(f"{'='*60}")
+
+    X_scaled, scaler = _scaled(df, features)
 
     # Search for optimal K
-    print(f"  K search (K={MIN_K}..{MAX_K}):")
-    results = []
-    for k in range(MIN_K, MAX_K + 1):
-        km = KMeans(n_clusters=k, n_init=10, max_iter=300, random_state=RANDOM_STATE)
-        labels = km.fit_predict(X_scaled)
-        sil = silhouette_score(X_scaled, labels)
-        results.append({"k": k, "silhouette": sil, "inertia": km.inertia_})
-        print(f"    K={k:>2}  sil={sil:.4f}  inertia={km.inertia_:>10.0f}")
+    _p(f"  K search (K={MIN_K}..{MAX_K}):")
+    results = Parallel(n_jobs=-1, backend="loky")(
+        delayed(_fit_k)(k, X_scaled) for k in range(MIN_K, MAX_K + 1)
+    )
+    for r in results:
+        _p(f"    K={r['k']:>2}  sil={r['silhouette']:.4f}  inertia={r['inertia']:>10.0f}")
 
     res_df = pd.DataFrame(results)
     best_row = res_df.loc[res_df["silhouette"].idxmax()]
     optimal_k = int(best_row["k"])
-    print(f"  -> Optimal K: {optimal_k} (sil={best_row['silhouette']:.4f})")
+    _p(f"  -> Optimal K: {optimal_k} (sil={best_row['silhouette']:.4f})")
 
     # Fit final model
     km = KMeans(n_clusters=optimal_k, n_init=20, max_iter=500, random_state=RANDOM_STATE)
@@ -227,14 +271,16 @@ def cluster_single_year(df, features, year, prefix, label):
     df["cluster"] = [f"{prefix}_{c}" for c in local_labels]
 
     # Cluster sizes
-    print(f"\n  Cluster sizes:")
+    _p(f"\n  Cluster sizes:")
     for cid, count in df["cluster"].value_counts().sort_index().items():
-        print(f"    {cid}: {count:,}")
+        _p(f"    {cid}: {count:,}")
 
     # 3D PCA
-    pca = PCA(n_components=min(3, len(features)), random_state=RANDOM_STATE)
-    X_3d = pca.fit_transform(X_scaled)
-    print(f"\n  PCA variance explained: "
+    pca = PCA(n_components=min(3, len(features)), svd_solver="randomized",
+              iterated_power=4, random_state=RANDOM_STATE)
+    # float64: pca_x/y/z are saved and exported, so keep their precision and dtype
+    X_3d = pca.fit_transform(_scaled(df, features, dtype=np.float64)[0])
+    _p(f"\n  PCA variance explained: "
           f"PC1={pca.explained_variance_ratio_[0]:.1%}, "
           f"PC2={pca.explained_variance_ratio_[1]:.1%}, "
           f"PC3={pca.explained_variance_ratio_[2]:.1%}")
@@ -246,49 +292,66 @@ def cluster_single_year(df, features, year, prefix, label):
     else:
         df["pca_x"] = -X_3d[:, 0] - X_OFFSET
 
-    # Per-cluster silhouette
+    # Per-cluster silhouette (exact, full sample; the K search only estimated it)
     sample_sils = silhouette_samples(X_scaled, local_labels)
-    print(f"\n  Per-cluster silhouette:")
+    final_sil = float(sample_sils.mean())
+    _p(f"\n  Final silhouette (K={optimal_k}): {final_sil:.4f}")
+    _p(f"\n  Per-cluster silhouette:")
     for i in range(optimal_k):
         mask = local_labels == i
         cid = f"{prefix}_{i}"
         mean_sil = sample_sils[mask].mean()
-        print(f"    {cid}: {mean_sil:.4f} (n={mask.sum():,})")
+        _p(f"    {cid}: {mean_sil:.4f} (n={mask.sum():,})")
 
     models = {
         "scaler": scaler,
         "kmeans": km,
         "pca": pca,
         "optimal_k": optimal_k,
-        "silhouette": float(best_row["silhouette"]),
+        "silhouette": final_sil,
     }
 
-    return df, models, res_df
+    return df, models, res_df, buf
 
 
 # ═══════════════════════════════════════════════════════════════
 # 4. CLUSTER PROFILING & NAMING
 # ═══════════════════════════════════════════════════════════════
 
-def _pitcher_traits(row, hand):
-    """Build traits dict from an individual pitcher row."""
-    return {
-        "ff": row.get("pct_FF", 0),
-        "si": row.get("pct_SI", 0),
-        "sl": row.get("pct_SL", 0),
-        "cu": row.get("pct_CU", 0),
-        "ch": row.get("pct_CH", 0),
-        "fs": row.get("pct_FS", 0),
-        "fc": row.get("pct_FC", 0),
-        "st": row.get("pct_ST", 0),
-        "kc": row.get("pct_KC", 0),
-        "kn": row.get("pct_KN", 0),
-        "whiff": row.get("whiff_rate", 0),
-        "gb": row.get("groundball_rate", 0),
-        "velo": row.get("avg_velo_FF", 0),
-        "is_sp": row.get("is_sp", 0),
-        "spin": row.get("spin_overall", 0),
-    }
+def _medoid_index(coords):
+    """Position of the most central row in coords. Exact L2 medoid, summed in
+    row blocks so memory stays O(n * MEDOID_CHUNK); very large groups use the
+    member nearest the centroid (it minimizes the summed *squared* distance)."""
+    from sklearn.metrics import pairwise_distances
+
+    n = len(coords)
+    if n > MEDOID_EXACT_MAX:
+        return int(np.argmin(((coords - coords.mean(axis=0)) ** 2).sum(axis=1)))
+    totals = np.zeros(n)
+    for s in range(0, n, MEDOID_CHUNK):
+        totals[s:s + MEDOID_CHUNK] = pairwise_distances(
+            coords[s:s + MEDOID_CHUNK], coords, metric="euclidean"
+        ).sum(axis=1)
+    return int(np.argmin(totals))
+
+
+# Trait key -> pitcher-season column, in the order profiles report them
+PITCHER_TRAIT_COLUMNS = {
+    "ff": "pct_FF", "si": "pct_SI", "sl": "pct_SL", "cu": "pct_CU", "ch": "pct_CH",
+    "fs": "pct_FS", "fc": "pct_FC", "st": "pct_ST", "kc": "pct_KC", "kn": "pct_KN",
+    "whiff": "whiff_rate", "gb": "groundball_rate", "velo": "avg_velo_FF",
+    "spin": "spin_overall", "is_sp": "is_sp",
+}
+
+
+def _trait_array(df):
+    """All PITCHER_TRAIT_COLUMNS as one NaN-filled (N, traits) array (missing columns -> 0)."""
+    return df.reindex(columns=list(PITCHER_TRAIT_COLUMNS.values())).fillna(0).to_numpy(dtype=np.float64)
+
+
+def _pitcher_traits(TA, pos):
+    """Build traits dict for the pitcher at row position pos of a _trait_array."""
+    return dict(zip(PITCHER_TRAIT_COLUMNS, TA[pos].tolist()))
 
 
 def profile_clusters(df, features, year):
@@ -298,118 +361,86 @@ def profile_clusters(df, features, year):
     Sub-archetype and MUTT detection still use individual pitcher traits.
     Output keyed by hand_archetype (e.g. RHP_Barnburner).
     """
-    from scipy.spatial.distance import cdist
-
-    print(f"\n{'='*60}")
-    print(f"  CLUSTER PROFILES (DNA SYSTEM) — {year}")
-    print(f"{'='*60}")
-
-    emoji_map = {
-        "Snake": "\U0001F40D", "Triple Threat": "3\uFE0F\u20E3",
-        "Split Demon": "\U0001F479", "Yakker": "\U0001F9AC",
-        "Boomerang": "\U0001FA83",
-        "Knuckleball Wizard": "\U0001F9D9", "Barnburner": "\u26FD",
-        "Uncle Charlie": "\U0001F37A", "Ghost": "\U0001F47B",
-        "Cutman": "\U0001F5E1", "Earthworm": "\U0001FAB1",
-        "Gardener": "\U0001F9D1\u200D\U0001F33E", "Undertow": "\U0001F30A",
-        "Eephus Lobber": "\U0001FAA6", "Kitchen Sink": "\U0001F6B0",
-        "Heavy Duty": "\U0001F3CB\uFE0F", "Swordfighter": "\u2694\uFE0F",
-        "CutCraft": "\u2702\uFE0F",
-    }
+    buf = []
+    _p = buf.append
+    _p(f"\n{'='*60}")
+    _p(f"  CLUSTER PROFILES (DNA SYSTEM) — {year}")
+    _p(f"{'='*60}")
 
     # ── Step 1: Name each K-means cluster from its geometric medoid ──
     cluster_archetypes = {}   # cluster_id -> archetype name
     cluster_medoid_rows = {}  # cluster_id -> medoid pitcher row
 
-    for cid in df["cluster"].unique():
-        members = df[df["cluster"] == cid]
-        if len(members) == 0:
+    # Column arrays once; medoids are looked up by row position
+    TA = _trait_array(df)
+    cluster_arr = df["cluster"].to_numpy()
+    total_pitches = df["total_pitches"].to_numpy()
+    feature_cols = [f for f in features if f in df.columns]
+    FA = df[feature_cols].fillna(0).to_numpy()
+
+    for cid in pd.unique(cluster_arr):
+        pos = np.flatnonzero(cluster_arr == cid)
+        if len(pos) == 0:
             continue
 
         # Position-player junk
-        if members["total_pitches"].mean() < 100:
+        if total_pitches[pos].mean() < 100:
             cluster_archetypes[cid] = "Eephus Lobber"
-            cluster_medoid_rows[cid] = members.iloc[0]
+            cluster_medoid_rows[cid] = df.iloc[pos[0]]
             continue
 
         # Find geometric medoid in clustering feature space
-        feature_cols = [f for f in features if f in members.columns]
-        coords = members[feature_cols].fillna(0).values
-        if len(coords) < 2:
-            medoid_row = members.iloc[0]
+        if len(pos) < 2:
+            medoid_pos = pos[0]
         else:
-            dist_matrix = cdist(coords, coords, metric='euclidean')
-            total_dists = dist_matrix.sum(axis=1)
-            medoid_row = members.iloc[int(np.argmin(total_dists))]
+            medoid_pos = pos[_medoid_index(FA[pos])]
 
-        cluster_medoid_rows[cid] = medoid_row
+        cluster_medoid_rows[cid] = df.iloc[medoid_pos]
         hand = "RHP" if cid.startswith("R") else "LHP"
-        t = _pitcher_traits(medoid_row, hand)
+        t = _pitcher_traits(TA, medoid_pos)
         cluster_archetypes[cid] = _archetype_name(t, hand)
 
-    print(f"\n  K-means clusters → archetype names (via medoid):")
+    _p(f"\n  K-means clusters → archetype names (via medoid):")
     for cid in sorted(cluster_archetypes.keys()):
         med = cluster_medoid_rows.get(cid)
         med_name = med.get("player_name", "?") if med is not None else "?"
-        print(f"    {cid} → {cluster_archetypes[cid]} (medoid: {med_name})")
+        _p(f"    {cid} → {cluster_archetypes[cid]} (medoid: {med_name})")
 
     # ── Step 2: Assign each pitcher archetype from their cluster ──
-    arch_list, sub_list, dna_list = [], [], []
-    for idx, prow in df.iterrows():
-        cid = prow["cluster"]
-        hand = "RHP" if prow.get("is_rhp", 1) == 1 else "LHP"
-
-        # Position-player junk
-        if prow.get("total_pitches", 0) < 100:
-            arch_list.append("Eephus Lobber")
-            sub_list.append("Pure")
-            dna_list.append("Eephus Lobber")
-            continue
+    # Primary archetype comes from the CLUSTER (medoid-named)
+    primary = df["cluster"].map(cluster_archetypes).fillna("Kitchen Sink").to_numpy(dtype=object)
+    primary_idx = np.array([RULE_INDEX.get(name, -1) for name in primary], dtype=np.int64)
 
-        # Primary archetype comes from the CLUSTER (medoid-named)
-        primary = cluster_archetypes.get(cid, "Kitchen Sink")
+    # Sub-archetype: highest-scoring OTHER rule this pitcher triggers
+    # (first rule wins ties, like the stable sort it replaces).
+    # MUTT check: does this pitcher's individual rule assignment (first rule
+    # triggered, Kitchen Sink always fires) differ from their cluster's archetype?
+    T = TA[:, :len(RULE_TRAIT_COLUMNS)]  # RULE_TRAIT_COLUMNS order
+    individual_idx, sub_idx = _classify(T, primary_idx)
+    has_sub = sub_idx >= 0
 
-        # Sub-archetype: what other rules does THIS pitcher trigger?
-        t = _pitcher_traits(prow, hand)
-        triggered = []
-        for name, test_fn, defining_fn in ARCHETYPE_RULES:
-            if name == primary or name == "Kitchen Sink":
-                continue
-            if test_fn(t, hand):
-                triggered.append((name, defining_fn(t)))
+    sub = np.where(has_sub, RULE_NAMES[sub_idx], "Pure").astype(object)
+    is_mutt = RULE_NAMES[individual_idx] != primary
 
-        if triggered:
-            triggered.sort(key=lambda x: x[1], reverse=True)
-            sub = triggered[0][0]
-        else:
-            sub = "Pure"
-
-        # MUTT check: does this pitcher's individual rule assignment
-        # differ from their cluster's archetype?
-        individual_arch = _archetype_name(t, hand)
-        is_mutt = (individual_arch != primary)
-
-        # Build display string
-        if sub == "Pure" and not is_mutt:
-            dna_str = primary
-        elif is_mutt:
-            dna_str = f"\U0001F9EC {primary} / {sub}"
-        else:
-            dna_str = f"{primary} / {sub}"
-
-        arch_list.append(primary)
-        sub_list.append(sub)
-        dna_list.append(dna_str)
+    # Build display string
+    dna = np.where(
+        is_mutt, "\U0001F9EC " + primary + " / " + sub,
+        np.where(sub == "Pure", primary, primary + " / " + sub),
+    )
 
-    df["archetype"] = arch_list
-    df["sub_archetype"] = sub_list
-    df["archetype_dna"] = dna_list
+    # Position-player junk
+    junk = (df["total_pitches"] < 100).to_numpy()
+    df["archetype"] = np.where(junk, "Eephus Lobber", primary)
+    df["sub_archetype"] = np.where(junk, "Pure", sub)
+    df["archetype_dna"] = np.where(junk, "Eephus Lobber", dna)
 
     # ── Step 3: Group by (hand, archetype) and build profiles ──
     profiles = {}
-    for (hand_label, arch_name), group in df.groupby(
+    group_positions = df.groupby(
         [df["is_rhp"].map({1: "RHP", 0: "LHP"}), "archetype"]
-    ):
+    ).indices
+    for (hand_label, arch_name), pos in sorted(group_positions.items()):
+        group = df.iloc[pos]
         count = len(group)
         if count == 0:
             continue
@@ -420,16 +451,19 @@ def profile_clusters(df, features, year):
         pca_cols = [c for c in ["pca_x", "pca_y", "pca_z"] if c in group.columns]
         if len(pca_cols) >= 2 and len(group) >= 2:
             pca_coords = group[pca_cols].fillna(0).values
-            dist_matrix = cdist(pca_coords, pca_coords, metric='euclidean')
-            total_dists = dist_matrix.sum(axis=1)
-            medoid_row = group.iloc[int(np.argmin(total_dists))]
+            medoid_pos = pos[_medoid_index(pca_coords)]
         else:
-            medoid_row = group.iloc[0]
+            medoid_pos = pos[0]
+        medoid_row = df.iloc[medoid_pos]
 
         avg_pitches = group["total_pitches"].mean()  # group metadata, not trait averaging
 
+        # Medoid pitcher's actual traits (NO averaging)
+        raw_traits = _pitcher_traits(TA, medoid_pos)
+        medoid_traits = {k: round(v, 3) for k, v in raw_traits.items()}
+
         # Role from medoid
-        medoid_sp = float(medoid_row.get("is_sp", 0))
+        medoid_sp = raw_traits["is_sp"]
         if medoid_sp > 0.55:
             role = "SP"
         elif medoid_sp < 0.35:
@@ -437,17 +471,6 @@ def profile_clusters(df, features, year):
         else:
             role = "SW"
 
-        # Medoid pitcher's actual traits (NO averaging)
-        medoid_traits = {}
-        for col_key, col_name in [
-            ("ff", "pct_FF"), ("si", "pct_SI"), ("sl", "pct_SL"), ("cu", "pct_CU"),
-            ("ch", "pct_CH"), ("fs", "pct_FS"), ("fc", "pct_FC"), ("st", "pct_ST"),
-            ("kc", "pct_KC"), ("kn", "pct_KN"), ("whiff", "whiff_rate"),
-            ("gb", "groundball_rate"), ("velo", "avg_velo_FF"), ("spin", "spin_overall"),
-        ]:
-            medoid_traits[col_key] = round(float(medoid_row.get(col_name, 0)), 3) if col_name in group.columns else 0
-        medoid_traits["is_sp"] = round(float(medoid_sp), 3)
-
         # Top pitches from medoid
         pitch_keys = [("ff", "FF"), ("si", "SI"), ("sl", "SL"), ("cu", "CU"),
                       ("ch", "CH"), ("fs", "FS"), ("fc", "FC"), ("st", "ST"),
@@ -466,7 +489,7 @@ def profile_clusters(df, features, year):
         sub_counts = Counter(group["sub_archetype"])
         mutt_count = sum(1 for d in group["archetype_dna"] if "\U0001F9EC" in str(d))
 
-        emoji = emoji_map.get(arch_name, "\u2753")
+        emoji = EMOJI_MAP.get(arch_name, "\u2753")
 
         profiles[key] = {
             "name": arch_name,
@@ -485,19 +508,54 @@ def profile_clusters(df, features, year):
 
         # Print summary
         pure_count = sub_counts.get("Pure", 0)
-        print(f"\n  {key} {emoji} {arch_name} ({role}) — {count} pitchers")
-        print(f"    Medoid: {medoid_row.get('player_name', '?')}")
-        print(f"    Pitches: {top_str}")
-        print(f"    Whiff: {medoid_traits['whiff']:.1%} | GB: {medoid_traits['gb']:.1%} | Velo: {medoid_traits['velo']:.1f}")
-        print(f"    Purebred: {pure_count} | Mutts: {mutt_count}")
-        print(f"    Examples: {', '.join(examples)}")
+        _p(f"\n  {key} {emoji} {arch_name} ({role}) — {count} pitchers")
+        _p(f"    Medoid: {medoid_row.get('player_name', '?')}")
+        _p(f"    Pitches: {top_str}")
+        _p(f"    Whiff: {medoid_traits['whiff']:.1%} | GB: {medoid_traits['gb']:.1%} | Velo: {medoid_traits['velo']:.1f}")
+        _p(f"    Purebred: {pure_count} | Mutts: {mutt_count}")
+        _p(f"    Examples: {', '.join(examples)}")
         if len(sub_counts) > 1:
             sub_str = ", ".join(f"{n}: {c}" for n, c in sub_counts.most_common() if n != "Pure")
-            print(f"    Sub-breeds: {sub_str}")
+            _p(f"    Sub-breeds: {sub_str}")
 
+    _flush(buf)
     return profiles
 
 
+# Trait keys the archetype rules read: the pitch-mix head of PITCHER_TRAIT_COLUMNS,
+# so a _trait_array's first len(RULE_TRAIT_COLUMNS) columns are the rule traits
+RULE_TRAIT_COLUMNS = dict(list(PITCHER_TRAIT_COLUMNS.items())[:10])
+
+
+def _rule_matrices(t):
+    """Evaluate every ARCHETYPE_RULES test / defining-pitch function on trait columns.
+    Returns (triggered (N, rules) bool, scores (N, rules) float) in rule order."""
+    n = len(t["ff"])
+    triggered = np.column_stack([
+        np.broadcast_to(test_fn(t, None), n) for _, test_fn, _ in ARCHETYPE_RULES
+    ])
+    scores = np.column_stack([
+        np.broadcast_to(defining_fn(t), n) for _, _, defining_fn in ARCHETYPE_RULES
+    ])
+    return triggered, scores
+
+
+def _classify(T, primary_idx):
+    """Rule engine over the (N, 10) trait matrix (RULE_TRAIT_COLUMNS order).
+    Returns (first triggered rule, best-scoring rule other than the primary and
+    Kitchen Sink, or -1) per row; the first rule wins score ties."""
+    triggered, scores = _rule_matrices(dict(zip(RULE_TRAIT_COLUMNS, T.T)))
+    individual_idx = triggered.argmax(axis=1)
+
+    # Sub-rule candidates: clear each row's primary and Kitchen Sink in place
+    rows = np.flatnonzero(primary_idx >= 0)
+    triggered[rows, primary_idx[rows]] = False
+    triggered[:, RULE_INDEX["Kitchen Sink"]] = False
+    scores[~triggered] = -np.inf
+    sub_idx = np.where(triggered.any(axis=1), scores.argmax(axis=1), -1)
+    return individual_idx, sub_idx
+
+
 def _archetype_name(t, hand):
     """Apply our naming convention to a trait dict. 16 archetypes, priority order."""
     if t["kn"] > 0.10:
@@ -537,27 +595,29 @@ def _archetype_name(t, hand):
 
 # ── Archetype rule definitions for DNA system ──
 # Each rule: (name, test_fn, defining_pitches_fn)
-#   test_fn(t, hand) -> bool
+#   test_fn(t, hand) -> bool (or bool array when t holds trait columns)
 #   defining_pitches_fn(t) -> float (sum of the pitches that define this archetype)
 ARCHETYPE_RULES = [
     ("Knuckleball Wizard", lambda t, h: t["kn"] > 0.10,           lambda t: t["kn"]),
     ("Split Demon",        lambda t, h: t["fs"] > 0.15,           lambda t: t["fs"]),
     ("Uncle Charlie",      lambda t, h: t["kc"] > 0.15,           lambda t: t["kc"]),
-    ("Undertow",           lambda t, h: t["si"] > 0.35 and t["ff"] < 0.05, lambda t: t["si"]),
+    ("Undertow",           lambda t, h: (t["si"] > 0.35) & (t["ff"] < 0.05), lambda t: t["si"]),
     ("Boomerang",          lambda t, h: t["st"] > 0.20,           lambda t: t["st"]),
     ("Ghost",              lambda t, h: t["ch"] > 0.20,           lambda t: t["ch"]),
-    ("Snake",              lambda t, h: t["si"] > 0.35 and t["fc"] > 0.15, lambda t: t["si"] + t["fc"]),
-    ("Gardener",           lambda t, h: t["si"] > 0.35 and t["sl"] > 0.18, lambda t: t["si"] + t["sl"]),
+    ("Snake",              lambda t, h: (t["si"] > 0.35) & (t["fc"] > 0.15), lambda t: t["si"] + t["fc"]),
+    ("Gardener",           lambda t, h: (t["si"] > 0.35) & (t["sl"] > 0.18), lambda t: t["si"] + t["sl"]),
     ("Earthworm",          lambda t, h: t["si"] > 0.50,           lambda t: t["si"]),
-    ("Barnburner",         lambda t, h: t["ff"] > 0.40 and t["sl"] > 0.30, lambda t: t["ff"] + t["sl"]),
-    ("Triple Threat",      lambda t, h: t["ff"] > 0.40 and t["sl"] > 0.15 and t["cu"] > 0.10, lambda t: t["ff"] + t["sl"] + t["cu"]),
-    ("CutCraft",           lambda t, h: t["cu"] > 0.15 and (t["fc"] > 0.12 or t["sl"] > 0.15), lambda t: t["cu"] + t["fc"]),
+    ("Barnburner",         lambda t, h: (t["ff"] > 0.40) & (t["sl"] > 0.30), lambda t: t["ff"] + t["sl"]),
+    ("Triple Threat",      lambda t, h: (t["ff"] > 0.40) & (t["sl"] > 0.15) & (t["cu"] > 0.10), lambda t: t["ff"] + t["sl"] + t["cu"]),
+    ("CutCraft",           lambda t, h: (t["cu"] > 0.15) & ((t["fc"] > 0.12) | (t["sl"] > 0.15)), lambda t: t["cu"] + t["fc"]),
     ("Yakker",             lambda t, h: t["cu"] > 0.12,           lambda t: t["cu"]),
     ("Cutman",             lambda t, h: t["fc"] > 0.15,           lambda t: t["fc"]),
     ("Swordfighter",       lambda t, h: t["sl"] > 0.25,           lambda t: t["sl"]),
     ("Heavy Duty",         lambda t, h: t["ff"] + t["si"] > 0.50, lambda t: t["ff"] + t["si"]),
-    ("Kitchen Sink",       lambda t, h: True,                     lambda t: 0.0),
+    ("Kitchen Sink",       lambda t, h: np.full(np.shape(t["ff"]), True), lambda t: 0.0),
 ]
+RULE_NAMES = np.array([name for name, _, _ in ARCHETYPE_RULES], dtype=object)
+RULE_INDEX = {name: i for i, name in enumerate(RULE_NAMES)}
 
 
 def _archetype_dna(t, hand):
@@ -634,10 +694,10 @@ def main():
     print(f"  v22 PER-YEAR ANALYSIS: {year}")
     print(f"{'#'*60}")
 
-    # Load full dataset and filter to year
+    # Load only this year's rows. All columns are kept: the per-year
+    # pitcher_seasons.parquet we save carries the full input schema.
     data_path = os.path.join(PROCESSED_DATA_DIR, "pitcher_seasons.parquet")
-    all_data = pd.read_parquet(data_path)
-    df = all_data[all_data["game_year"] == year].copy()
+    df = pd.read_parquet(data_path, filters=[("game_year", "==", year)], engine="pyarrow")
 
     print(f"\n  Total pitcher-seasons in {year}: {len(df):,}")
     rhp = df[df["is_rhp"] == 1].copy()
@@ -670,26 +730,38 @@ def main():
         # LHP only
         corr_lhp, vif_lhp = feature_diagnostics(lhp, features, f"LHP {year}")
 
+    # ═════════════ CLUSTERING ═════════════
+    print(f"\n\n{'#'*60}")
+    print(f"  SECTION 2: KMEANS CLUSTERING")
+    print(f"{'#'*60}")
+
+    # RHP and LHP are independent: overlap them. threadpool_limits halves BLAS
+    # threads in this process only (final fit, silhouette, PCA); the K-search
+    # runs in loky worker processes, which joblib already caps at
+    # cpu_count // n_jobs (= 1) BLAS threads each and the limit does not reach.
+    with threadpool_limits(limits=max(1, (os.cpu_count() or 2) // 2)), \
+            ThreadPoolExecutor(max_workers=2) as pool:
+        rhp_future = pool.submit(cluster_single_year, rhp, features, year, "R", "RHP")
+        lhp_future = pool.submit(cluster_single_year, lhp, features, year, "L", "LHP")
+        rhp_out, rhp_models, rhp_k_results, rhp_log = rhp_future.result()
+        lhp_out, lhp_models, lhp_k_results, lhp_log = lhp_future.result()
+    # Print after both finish so the sections always come out RHP, then LHP
+    _flush(rhp_log)
+    _flush(lhp_log)
+
     # ═════════════ DROP-ONE ═════════════
+    # Runs after clustering so each hand reuses its chosen K instead of re-searching
     if not args.skip_dropone:
         print(f"\n\n{'#'*60}")
-        print(f"  SECTION 2: DROP-ONE SILHOUETTE")
+        print(f"  SECTION 3: DROP-ONE SILHOUETTE")
         print(f"{'#'*60}")
 
-        rhp_baseline, rhp_k, rhp_dropone = drop_one_analysis(rhp, features, f"RHP {year}")
-        lhp_baseline, lhp_k, lhp_dropone = drop_one_analysis(lhp, features, f"LHP {year}")
-
-    # ═════════════ CLUSTERING ═════════════
-    print(f"\n\n{'#'*60}")
-    print(f"  SECTION 3: KMEANS CLUSTERING")
-    print(f"{'#'*60}")
-
-    rhp_out, rhp_models, rhp_k_results = cluster_single_year(
-        rhp, features, year, "R", "RHP"
-    )
-    lhp_out, lhp_models, lhp_k_results = cluster_single_year(
-        lhp, features, year, "L", "LHP"
-    )
+        rhp_baseline, rhp_k, rhp_dropone = drop_one_analysis(
+            rhp, features, f"RHP {year}", k=rhp_models["optimal_k"]
+        )
+        lhp_baseline, lhp_k, lhp_dropone = drop_one_analysis(
+            lhp, features, f"LHP {year}", k=lhp_models["optimal_k"]
+        )
 
     # Merge
     all_clustered = pd.concat([rhp_out, lhp_out], ignore_index=True)
@@ -731,11 +803,16 @@ def main():
     out_dir = os.path.join(MODELS_DIR, str(year))
     os.makedirs(out_dir, exist_ok=True)
 
-    # Save models
+    # Save models as fp32 arrays (np.load gives means, scale, centers, pca_components, pca_mean)
     for prefix, models in [("R", rhp_models), ("L", lhp_models)]:
-        joblib.dump(models["scaler"], os.path.join(out_dir, f"scaler_{prefix}.joblib"))
-        joblib.dump(models["kmeans"], os.path.join(out_dir, f"kmeans_{prefix}.joblib"))
-        joblib.dump(models["pca"], os.path.join(out_dir, f"pca_{prefix}.joblib"))
+        np.savez_compressed(
+            os.path.join(out_dir, f"models_{prefix}.npz"),
+            means=models["scaler"].mean_.astype(np.float32),
+            scale=models["scaler"].scale_.astype(np.float32),
+            centers=models["kmeans"].cluster_centers_.astype(np.float32),
+            pca_components=models["pca"].components_.astype(np.float32),
+            pca_mean=models["pca"].mean_.astype(np.float32),
+        )
 
     # Save profiles
     with open(os.path.join(out_dir, "cluster_profiles.json"), "w") as f:
@@ -754,6 +831,7 @@ def main():
         "lhp_silhouette": lhp_models["silhouette"],
         "features": features,
         "total_pitcher_seasons": len(all_clustered),
+        "model_files": {"R": "models_R.npz", "L": "models_L.npz"},
     }
     with open(os.path.join(out_dir, "meta.json"), "w") as f:
         json.dump(meta, f, indent=2)
@@ -0,0 +1,11 @@
+"""
+Small file helpers shared by the scripts.
+"""
+import os
+
+def write_atomic(path, data):
+    """Write bytes to path via a temp file + rename, so a crash never leaves it half-written."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
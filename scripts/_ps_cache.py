@@ -0,0 +1,39 @@
+"""
+Shared, cached loader for the (pitcher, player_name) pairs in pitcher_seasons.json.
+
+Both roster scripts only need those two fields. The first call streams them out
+of the JSON and pickles them under data/cache; later calls load the pickle as
+long as the JSON's mtime and size are unchanged.
+"""
+import os
+import pickle
+import sys
+import ijson
+from _files import write_atomic
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import CACHE_DIR
+
+PS_PATH = "/Users/jackmorello/Desktop/MLB_PitcherChart/frontend/public/pitcher_seasons.json"
+CACHE_PATH = os.path.join(CACHE_DIR, "pitcher_seasons.pkl")
+
+def load_pitcher_seasons(ps_path=PS_PATH):
+    """Return [(pitcher, player_name), ...] in file order, one per pitcher-season."""
+    st = os.stat(ps_path)
+    stamp = (os.path.abspath(ps_path), st.st_mtime_ns, st.st_size)
+
+    try:
+        with open(CACHE_PATH, "rb") as f:
+            cached = pickle.load(f)
+        if cached["stamp"] == stamp:
+            return cached["rows"]
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+        pass  # missing or unreadable cache: rebuild below
+
+    # Stream records rather than loading the whole array
+    with open(ps_path, "rb") as f:
+        rows = [(r["pitcher"], r["player_name"]) for r in ijson.items(f, "item")]
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    write_atomic(CACHE_PATH, pickle.dumps({"stamp": stamp, "rows": rows}, protocol=pickle.HIGHEST_PROTOCOL))
+    return rows
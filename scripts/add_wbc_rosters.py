@@ -3,8 +3,14 @@
 Add WBC 2026 rosters to teams_2026.json by matching pitcher names to MLBAM IDs.
 Uses pitcher_seasons.json as the name→ID lookup.
 """
-import json
+import functools
 import re
+import unicodedata
+import numpy as np
+import orjson
+from rapidfuzz import process, fuzz
+from _files import write_atomic
+from _ps_cache import load_pitcher_seasons
 
 # WBC 2026 pitcher rosters (names as they appear in MLB records)
 WBC_PITCHERS = {
@@ -129,6 +135,9 @@ WBC_PITCHERS = {
     ]
 }
 
+# Flat ((team, name), ...) view of WBC_PITCHERS for the batch name match
+WBC_FLAT = tuple((team, name) for team, names in WBC_PITCHERS.items() for name in names)
+
 # Team display names
 WBC_TEAM_NAMES = {
     "WBC-USA": "United States",
@@ -152,38 +161,96 @@ WBC_TEAM_NAMES = {
     "WBC-CZE": "Czechia",
 }
 
+# Minimum rapidfuzz WRatio (0-100) between first names for a fuzzy match
+FUZZY_CUTOFF = 88
+
+# Punctuation dropped from names
+_PUNCT_RE = re.compile(r"[.'`]")
+
+@functools.lru_cache(maxsize=None)
 def normalize(name):
     """Normalize a name for matching — lowercase, strip accents/punctuation."""
-    name = name.lower().strip()
-    # Remove common accent chars
-    replacements = {
-        'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ú': 'u',
-        'ñ': 'n', 'ü': 'u', 'ö': 'o', 'ä': 'a',
-    }
-    for k, v in replacements.items():
-        name = name.replace(k, v)
+    # NFKD splits accented letters into base + combining mark; drop the marks
+    name = unicodedata.normalize("NFKD", name.lower().strip())
+    name = "".join(c for c in name if not unicodedata.combining(c))
     # Remove periods, apostrophes
-    name = re.sub(r"[.'`]", "", name)
-    return name
+    return _PUNCT_RE.sub("", name)
+
+def block_key(norm):
+    """(last name, first initial) of a normalized "last, first" name."""
+    last, _, first = norm.partition(",")
+    return last.strip(), first.strip()[:1]
+
+def prefix_key(norm):
+    """(last name, first 3 letters of first name): the partial-match rule."""
+    parts = norm.split(",")
+    return parts[0].strip(), parts[-1].strip()[:3]
+
+def first_name(norm):
+    """First-name part of a normalized "last, first" name."""
+    return norm.partition(",")[2].strip()
+
+def resolve_ids(queries, name_to_id):
+    """Map normalized WBC names to MLBAM IDs (None when unmatched).
+
+    Exact lookups first, then the partial rule (same last name, same first
+    three letters of the first name; first such name wins). Names still
+    missing go through one rapidfuzz cdist pass that compares first names
+    against the known names in the miss's (last name, first initial) block.
+    A match must reach FUZZY_CUTOFF. Only first names are scored, because
+    the shared last name would otherwise inflate the score."""
+    resolved = {q: name_to_id.get(q) for q in queries}
+    misses = [q for q, pid in resolved.items() if pid is None]
+    if not misses or not name_to_id:
+        return resolved
+
+    by_prefix = {}
+    for name, pid in name_to_id.items():
+        by_prefix.setdefault(prefix_key(name), pid)
+    for q in misses:
+        resolved[q] = by_prefix.get(prefix_key(q))
+    misses = [q for q in misses if resolved[q] is None]
+    if not misses:
+        return resolved
+
+    # Score only names from the misses' blocks, not the whole pool
+    miss_keys = [block_key(q) for q in misses]
+    wanted = set(miss_keys)
+    choices = [c for c in name_to_id if block_key(c) in wanted]
+    if not choices:
+        return resolved
+    scores = process.cdist([first_name(q) for q in misses], [first_name(c) for c in choices],
+                           scorer=fuzz.WRatio, score_cutoff=FUZZY_CUTOFF, workers=-1)
+
+    # Zero out candidates from other misses' blocks
+    block_ids = {key: i for i, key in enumerate(wanted)}
+    choice_blocks = np.array([block_ids[block_key(c)] for c in choices])
+    miss_blocks = np.array([block_ids[key] for key in miss_keys])
+    scores[choice_blocks[None, :] != miss_blocks[:, None]] = 0
+
+    best = scores.argmax(axis=1)
+    for q, j, score in zip(misses, best, scores[np.arange(len(misses)), best]):
+        if score > 0:  # anything under the cutoff scores 0
+            resolved[q] = name_to_id[choices[j]]
+    return resolved
 
 def main():
     # Build name→ID lookup from pitcher_seasons.json
-    ps_path = "/Users/jackmorello/Desktop/MLB_PitcherChart/frontend/public/pitcher_seasons.json"
-    with open(ps_path) as f:
-        ps_data = json.load(f)
-
     # Use latest season's entry for each pitcher
     name_to_id = {}
-    for r in ps_data:
-        norm = normalize(r["player_name"])
-        name_to_id[norm] = r["pitcher"]
+    for pid, player_name in load_pitcher_seasons():
+        name_to_id[normalize(player_name)] = pid
 
     print(f"Loaded {len(name_to_id)} unique pitcher names from pitcher_seasons.json")
 
     # Load existing teams_2026.json
     teams_path = "/Users/jackmorello/Desktop/MLB_PitcherChart/frontend/public/teams_2026.json"
-    with open(teams_path) as f:
-        teams_data = json.load(f)
+    with open(teams_path, "rb") as f:
+        teams_data = orjson.loads(f.read())
+
+    # Resolve every WBC name across all teams at once
+    queries = list(dict.fromkeys(normalize(name) for _, name in WBC_FLAT))
+    lookup = resolve_ids(queries, name_to_id).get
 
     total_matched = 0
     total_missed = 0
@@ -191,26 +258,15 @@ def main():
     for team_abbr, pitcher_names in WBC_PITCHERS.items():
         matched_ids = []
         missed_names = []
+        matched_append = matched_ids.append
+        missed_append = missed_names.append
 
         for name in pitcher_names:
-            norm = normalize(name)
-            if norm in name_to_id:
-                matched_ids.append(name_to_id[norm])
+            pid = lookup(normalize(name))
+            if pid is not None:
+                matched_append(pid)
             else:
-                # Try partial matching (last name only)
-                last = norm.split(",")[0].strip()
-                found = False
-                for k, v in name_to_id.items():
-                    if k.startswith(last + ","):
-                        # Check if first name initial matches
-                        first_wbc = norm.split(",")[-1].strip()[:3]
-                        first_db = k.split(",")[-1].strip()[:3]
-                        if first_wbc == first_db:
-                            matched_ids.append(v)
-                            found = True
-                            break
-                if not found:
-                    missed_names.append(name)
+                missed_append(name)
 
         # Add to teams_2026.json
         display_name = WBC_TEAM_NAMES.get(team_abbr, team_abbr)
@@ -227,8 +283,7 @@ def main():
     print(f"\nWBC Total: {total_matched} matched, {total_missed} not in data")
 
     # Write updated file
-    with open(teams_path, "w") as f:
-        json.dump(teams_data, f, indent=2)
+    write_atomic(teams_path, orjson.dumps(teams_data, option=orjson.OPT_INDENT_2))
     print(f"Updated {teams_path}")
 
 if __name__ == "__main__":
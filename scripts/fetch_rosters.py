@@ -3,85 +3,161 @@
 Fetch current 40-man rosters for all 30 MLB teams from the MLB Stats API.
 Outputs teams_2026.json for the ARCHETYPE//ATLAS.MLB team filter.
 """
-import json
-import urllib.request
-import time
+import asyncio
+import orjson
 import sys
+import time
+import httpx
+from typing import NamedTuple
+from _files import write_atomic
+from _ps_cache import load_pitcher_seasons
 
 API_BASE = "https://statsapi.mlb.com/api/v1"
 
+class Team(NamedTuple):
+    id: int
+    abbr: str
+    name: str
+    lg: str
+    div: str
+
 # All 30 MLB teams with their IDs, abbreviations, and divisions
-MLB_TEAMS = [
+MLB_TEAMS = (
     # AL East
-    (110, "BAL", "Baltimore Orioles", "AL", "East"),
-    (111, "BOS", "Boston Red Sox", "AL", "East"),
-    (147, "NYY", "New York Yankees", "AL", "East"),
-    (139, "TB",  "Tampa Bay Rays", "AL", "East"),
-    (141, "TOR", "Toronto Blue Jays", "AL", "East"),
+    Team(110, "BAL", "Baltimore Orioles", "AL", "East"),
+    Team(111, "BOS", "Boston Red Sox", "AL", "East"),
+    Team(147, "NYY", "New York Yankees", "AL", "East"),
+    Team(139, "TB",  "Tampa Bay Rays", "AL", "East"),
+    Team(141, "TOR", "Toronto Blue Jays", "AL", "East"),
     # AL Central
-    (114, "CLE", "Cleveland Guardians", "AL", "Central"),
-    (145, "CWS", "Chicago White Sox", "AL", "Central"),
-    (116, "DET", "Detroit Tigers", "AL", "Central"),
-    (118, "KC",  "Kansas City Royals", "AL", "Central"),
-    (142, "MIN", "Minnesota Twins", "AL", "Central"),
+    Team(114, "CLE", "Cleveland Guardians", "AL", "Central"),
+    Team(145, "CWS", "Chicago White Sox", "AL", "Central"),
+    Team(116, "DET", "Detroit Tigers", "AL", "Central"),
+    Team(118, "KC",  "Kansas City Royals", "AL", "Central"),
+    Team(142, "MIN", "Minnesota Twins", "AL", "Central"),
     # AL West
-    (117, "HOU", "Houston Astros", "AL", "West"),
-    (108, "LAA", "Los Angeles Angels", "AL", "West"),
-    (133, "OAK", "Oakland Athletics", "AL", "West"),
-    (136, "SEA", "Seattle Mariners", "AL", "West"),
-    (140, "TEX", "Texas Rangers", "AL", "West"),
+    Team(117, "HOU", "Houston Astros", "AL", "West"),
+    Team(108, "LAA", "Los Angeles Angels", "AL", "West"),
+    Team(133, "OAK", "Oakland Athletics", "AL", "West"),
+    Team(136, "SEA", "Seattle Mariners", "AL", "West"),
+    Team(140, "TEX", "Texas Rangers", "AL", "West"),
     # NL East
-    (144, "ATL", "Atlanta Braves", "NL", "East"),
-    (146, "MIA", "Miami Marlins", "NL", "East"),
-    (121, "NYM", "New York Mets", "NL", "East"),
-    (143, "PHI", "Philadelphia Phillies", "NL", "East"),
-    (120, "WSH", "Washington Nationals", "NL", "East"),
+    Team(144, "ATL", "Atlanta Braves", "NL", "East"),
+    Team(146, "MIA", "Miami Marlins", "NL", "East"),
+    Team(121, "NYM", "New York Mets", "NL", "East"),
+    Team(143, "PHI", "Philadelphia Phillies", "NL", "East"),
+    Team(120, "WSH", "Washington Nationals", "NL", "East"),
     # NL Central
-    (112, "CHC", "Chicago Cubs", "NL", "Central"),
-    (113, "CIN", "Cincinnati Reds", "NL", "Central"),
-    (158, "MIL", "Milwaukee Brewers", "NL", "Central"),
-    (134, "PIT", "Pittsburgh Pirates", "NL", "Central"),
-    (138, "STL", "St. Louis Cardinals", "NL", "Central"),
+    Team(112, "CHC", "Chicago Cubs", "NL", "Central"),
+    Team(113, "CIN", "Cincinnati Reds", "NL", "Central"),
+    Team(158, "MIL", "Milwaukee Brewers", "NL", "Central"),
+    Team(134, "PIT", "Pittsburgh Pirates", "NL", "Central"),
+    Team(138, "STL", "St. Louis Cardinals", "NL", "Central"),
     # NL West
-    (109, "ARI", "Arizona Diamondbacks", "NL", "West"),
-    (115, "COL", "Colorado Rockies", "NL", "West"),
-    (119, "LAD", "Los Angeles Dodgers", "NL", "West"),
-    (135, "SD",  "San Diego Padres", "NL", "West"),
-    (137, "SF",  "San Francisco Giants", "NL", "West"),
-]
-
-def fetch_json(url):
+    Team(109, "ARI", "Arizona Diamondbacks", "NL", "West"),
+    Team(115, "COL", "Colorado Rockies", "NL", "West"),
+    Team(119, "LAD", "Los Angeles Dodgers", "NL", "West"),
+    Team(135, "SD",  "San Diego Padres", "NL", "West"),
+    Team(137, "SF",  "San Francisco Giants", "NL", "West"),
+)
+
+class TokenBucket:
+    """Allow `rate` requests per `per` seconds, with bursts of up to `burst` (default `rate`);
+    acquire() only sleeps once that budget is spent."""
+
+    def __init__(self, rate=5, per=1.0, burst=None):
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.fill_rate = rate / per
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        # No await before the bookkeeping, so concurrent tasks can't interleave it
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+        self.updated = now
+        self.tokens -= 1  # below zero = a reserved future slot
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.fill_rate)
+
+# Shared by every API call. The burst covers one per-team fallback round,
+# so its ~30 concurrent GETs go out together instead of over ~5 s;
+# sustained traffic is still held to 5 req/s.
+API_BUCKET = TokenBucket(rate=5, per=1.0, burst=len(MLB_TEAMS))
+
+def make_client():
+    """HTTP/2 client reused for every API call: concurrent GETs share one multiplexed connection."""
+    return httpx.AsyncClient(
+        http2=True, timeout=10, headers={"User-Agent": "MLB-PitcherChart/1.0"},
+    )
+
+async def fetch_json(client, url):
     """Fetch JSON from URL with retry."""
     for attempt in range(3):
+        await API_BUCKET.acquire()
         try:
-            req = urllib.request.Request(url, headers={"User-Agent": "MLB-PitcherChart/1.0"})
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                return json.loads(resp.read().decode())
-        except Exception as e:
+            resp = await client.get(url)
+            resp.raise_for_status()
+            return orjson.loads(resp.content)
+        except (httpx.HTTPError, orjson.JSONDecodeError):
             if attempt < 2:
-                time.sleep(1)
+                await asyncio.sleep(0.5 * 2 ** attempt)
             else:
-                raise e
+                raise
 
-def fetch_roster(team_id):
-    """Fetch 40-man roster for a team, return list of pitcher MLBAM IDs."""
-    url = f"{API_BASE}/teams/{team_id}/roster?rosterType=40Man"
-    data = fetch_json(url)
+# Position abbreviations counted as pitchers
+_PITCHER_ABBR = frozenset({"P", "SP", "RP"})
+
+def roster_pitchers(roster):
+    """Pitcher MLBAM IDs from a list of roster entries."""
     pitchers = []
-    for entry in data.get("roster", []):
-        person = entry.get("person", {})
-        position = entry.get("position", {})
+    pitchers_append = pitchers.append
+    for entry in roster:
+        pos = entry.get("position") or {}
         # Include pitchers (P) and two-way players
-        if position.get("abbreviation") == "P" or position.get("type") == "Pitcher":
-            pitchers.append(person["id"])
+        if pos.get("abbreviation") in _PITCHER_ABBR or pos.get("type") == "Pitcher":
+            pitchers_append(entry["person"]["id"])
     return pitchers
 
+async def fetch_roster(client, team_id):
+    """Fetch 40-man roster for a team, return list of pitcher MLBAM IDs."""
+    url = f"{API_BASE}/teams/{team_id}/roster?rosterType=40Man"
+    data = await fetch_json(client, url)
+    return roster_pitchers(data.get("roster", []))
+
+async def fetch_all_rosters(client):
+    """Fetch every team's 40-man roster in one request (roster hydrate).
+    Returns team_id -> list of pitcher MLBAM IDs for the teams that came back."""
+    ids = ",".join(str(team.id) for team in MLB_TEAMS)
+    url = f"{API_BASE}/teams?sportId=1&teamIds={ids}&hydrate=roster(rosterType=40Man)"
+    data = await fetch_json(client, url)
+    return {
+        team["id"]: roster_pitchers(team.get("roster", {}).get("roster", []))
+        for team in data.get("teams", [])
+        if "roster" in team
+    }
+
+async def fetch_rosters():
+    """All 30 rosters in one round trip; per-team requests only for teams it missed.
+    Returns (batched, fallback): team_id -> pitcher IDs, and team_id -> pitcher IDs
+    or the exception its per-team fetch raised."""
+    async with make_client() as client:
+        try:
+            batched = await fetch_all_rosters(client)
+        except Exception as e:
+            print(f"  Batched roster fetch failed ({e}), falling back to per-team", file=sys.stderr)
+            batched = {}
+
+        # Fallback requests are independent: issue them together over the one connection
+        missing = [team.id for team in MLB_TEAMS if team.id not in batched]
+        results = await asyncio.gather(
+            *(fetch_roster(client, team_id) for team_id in missing), return_exceptions=True
+        )
+    return batched, dict(zip(missing, results))
+
 def main():
     # Load existing pitcher IDs from pitcher_seasons.json to compute overlap
-    ps_path = "/Users/jackmorello/Desktop/MLB_PitcherChart/frontend/public/pitcher_seasons.json"
-    with open(ps_path) as f:
-        ps_data = json.load(f)
-    known_ids = set(r["pitcher"] for r in ps_data)
+    known_ids = {pid for pid, _ in load_pitcher_seasons()}
     print(f"Known pitcher IDs in data: {len(known_ids)}")
 
     teams_meta = {}
@@ -89,20 +165,22 @@ def main():
     total_pitchers = 0
     total_in_data = 0
 
-    for team_id, abbr, name, league, division in MLB_TEAMS:
+    batched, fallback = asyncio.run(fetch_rosters())
+
+    for team in MLB_TEAMS:
+        teams_meta[team.abbr] = {"name": team.name, "lg": team.lg, "div": team.div}
         try:
-            pitcher_ids = fetch_roster(team_id)
+            pitcher_ids = batched[team.id] if team.id in batched else fallback[team.id]
+            if isinstance(pitcher_ids, Exception):
+                raise pitcher_ids
             in_data = [pid for pid in pitcher_ids if pid in known_ids]
-            print(f"  {abbr:4s} {name:30s} → {len(pitcher_ids):2d} pitchers, {len(in_data):2d} in data")
-            teams_meta[abbr] = {"name": name, "lg": league, "div": division}
-            rosters[abbr] = pitcher_ids
+            print(f"  {team.abbr:4s} {team.name:30s} → {len(pitcher_ids):2d} pitchers, {len(in_data):2d} in data")
+            rosters[team.abbr] = pitcher_ids
             total_pitchers += len(pitcher_ids)
             total_in_data += len(in_data)
-            time.sleep(0.2)  # Rate limit
         except Exception as e:
-            print(f"  ERROR fetching {abbr}: {e}", file=sys.stderr)
-            teams_meta[abbr] = {"name": name, "lg": league, "div": division}
-            rosters[abbr] = []
+            print(f"  ERROR fetching {team.abbr}: {e}", file=sys.stderr)
+            rosters[team.abbr] = []
 
     print(f"\nTotal: {total_pitchers} pitchers across 30 teams, {total_in_data} found in pitcher_seasons.json")
 
@@ -114,8 +192,7 @@ def main():
     }
 
     out_path = "/Users/jackmorello/Desktop/MLB_PitcherChart/frontend/public/teams_2026.json"
-    with open(out_path, "w") as f:
-        json.dump(output, f, indent=2)
+    write_atomic(out_path, orjson.dumps(output, option=orjson.OPT_INDENT_2))
     print(f"\nWrote {out_path}")
 
 if __name__ == "__main__":